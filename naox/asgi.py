@@ -0,0 +1,5 @@
+from pyweb.handlers.asgi import ASGIHandler
+
+# ASGIサーバーから呼び出すアプリケーション
+# naoxディレクトリで実行する ex) uvicorn asgi:application
+application = ASGIHandler()
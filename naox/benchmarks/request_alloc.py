@@ -0,0 +1,139 @@
+"""
+HTTPRequestの生成にかかるメモリ確保量を計測するベンチマーク
+
+計測しているのはリクエストのパース(Worker.parse_http_request)のみで、
+URL解決やview、レスポンスの生成、socketの送受信は含まない
+Workerは1コネクションにつき1リクエストを処理するため、1リクエストの値が1コネクションの値になる
+
+naoxディレクトリで実行する
+$ python -m benchmarks.request_alloc
+"""
+import re
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+
+from pyweb.http.request import HTTPRequest
+from pyweb.server.worker import Worker
+
+REQUEST_BYTES = (
+    b"GET /show_request HTTP/1.1\r\n"
+    b"Host: localhost:8080\r\n"
+    b"User-Agent: Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36\r\n"
+    b"Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8\r\n"
+    b"Accept-Encoding: gzip, deflate\r\n"
+    b"Accept-Language: ja,en-US;q=0.9,en;q=0.8\r\n"
+    b"Cookie: username=naox; email=naox@example.com\r\n"
+    b"Connection: keep-alive\r\n"
+    b"\r\n"
+)
+
+ITERATIONS = 10000
+# スナップショットの取得は遅いため、ブロック数の計測は少ない回数で行う
+SNAPSHOT_ITERATIONS = 200
+
+
+@dataclass
+class LegacyHTTPRequest:
+    """
+    変更前のdataclass版HTTPRequest(比較用)
+    """
+    path: str = ""
+    method: str = ""
+    http_version: str = ""
+    body: bytes = b""
+    headers: dict = field(default_factory=dict)
+    cookies: dict = field(default_factory=dict)
+    params: dict = field(default_factory=dict)
+
+
+def legacy_parse(request: bytes) -> LegacyHTTPRequest:
+    """
+    変更前のWorker.parse_http_request(比較用)
+    """
+    request_line, remain = request.split(b"\r\n", maxsplit=1)
+    request_header, request_body = remain.split(b"\r\n\r\n", maxsplit=1)
+    method, path, http_version = request_line.decode().split(" ")
+
+    headers = {}
+    for header_row in request_header.decode().split("\r\n"):
+        key, value = re.split(r": *", header_row, maxsplit=1)
+        headers[key] = value
+
+    cookies = {}
+    if "Cookie" in headers:
+        for cookie_string in headers["Cookie"].split("; "):
+            name, value = cookie_string.split("=", maxsplit=1)
+            cookies[name] = value
+
+    return LegacyHTTPRequest(method=method, path=path, http_version=http_version, headers=headers, cookies=cookies, body=request_body)
+
+
+def measure(name: str, parse, release) -> None:
+    """
+    parseで生成したHTTPRequestを、releaseで解放するまでに確保されているメモリブロック数とバイト数、
+    およびparseとreleaseをITERATIONS回繰り返した時のメモリ確保量のピークを表示する
+    """
+    # 正規表現のキャッシュやプールの初期化など、初回のみの確保を計測から除外する
+    release(parse())
+
+    # take_snapshot()自体の確保を除外するフィルター
+    snapshot_filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+    tracemalloc.start()
+    blocks = 0
+    size = 0
+    for _ in range(SNAPSHOT_ITERATIONS):
+        before = tracemalloc.take_snapshot().filter_traces(snapshot_filters)
+        request = parse()
+        after = tracemalloc.take_snapshot().filter_traces(snapshot_filters)
+        release(request)
+        # 前回のHTTPRequestの解放が次の計測に混ざらないよう、参照を消しておく
+        del request
+
+        for stat in after.compare_to(before, "filename"):
+            blocks += max(stat.count_diff, 0)
+            size += max(stat.size_diff, 0)
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    for _ in range(ITERATIONS):
+        release(parse())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<28} "
+        f"allocations: {blocks / SNAPSHOT_ITERATIONS:>5.1f} blocks/connection  "
+        f"held: {size / SNAPSHOT_ITERATIONS:>7.1f} bytes/connection  "
+        f"peak: {peak:>6} bytes"
+    )
+
+
+def main() -> None:
+    worker = Worker(None, ("127.0.0.1", 0))
+
+    def legacy_release(request: LegacyHTTPRequest) -> None:
+        # 変更前はプールがなく、参照がなくなれば破棄される
+        pass
+
+    def pooled_without_headers() -> HTTPRequest:
+        # ヘッダーにアクセスしないview(staticなど)を想定
+        return worker.parse_http_request(REQUEST_BYTES)
+
+    def pooled_with_headers() -> HTTPRequest:
+        # ヘッダーとCookieにアクセスするview(show_request, welcomeなど)を想定
+        request = worker.parse_http_request(REQUEST_BYTES)
+        request.cookies
+        return request
+
+    print(f"instance size  legacy: {sys.getsizeof(LegacyHTTPRequest()) + sys.getsizeof(LegacyHTTPRequest().__dict__)} bytes"
+          f"  slotted: {sys.getsizeof(HTTPRequest())} bytes")
+    print("計測対象はリクエストのパースのみ(URL解決/view/レスポンス生成/送受信は含まない)")
+    measure("legacy dataclass", lambda: legacy_parse(REQUEST_BYTES), legacy_release)
+    measure("pooled (headers unused)", pooled_without_headers, worker.REQUEST_POOL.release)
+    measure("pooled (headers parsed)", pooled_with_headers, worker.REQUEST_POOL.release)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# settings, routers, viewsはnaoxディレクトリ直下のモジュールとしてimportされるため、
+# テスト実行時もnaoxディレクトリをimportパスに追加する
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,115 @@
+import asyncio
+import traceback
+from typing import Awaitable, Callable, Optional
+
+from pyweb.handlers.base import BaseHandler
+from pyweb.http.request import HTTPRequest
+
+
+class ASGIHandler(BaseHandler):
+    """
+    URLResolverとviewをASGIアプリケーションとして呼び出せるようにするクラス
+    uvicornなどのASGIサーバーから呼び出される
+    """
+
+    async def __call__(self, scope: dict, receive: Callable[[], Awaitable[dict]], send: Callable[[dict], Awaitable[None]]) -> None:
+        if scope["type"] == "lifespan":
+            await self.handle_lifespan(receive, send)
+            return
+
+        if scope["type"] != "http":
+            raise ValueError(f"ASGIHandler: 対応していないscopeです type: {scope['type']}")
+
+        body = await self.read_body(receive)
+        if body is None:
+            # リクエストの受信中にクライアントが切断した場合は、viewを呼び出さず何も送信しない
+            return
+
+        try:
+            request = self.build_request(scope, body)
+
+            # viewは同期関数のため、イベントループをブロックしないよう別スレッドで実行する
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, self.get_response, request)
+            # タスクがキャンセルされても別スレッドのviewは止まらないため、
+            # HTTPRequestはviewの実行が終わってからプールへ戻す
+            future.add_done_callback(lambda _: self.REQUEST_POOL.release(request))
+            response = await asyncio.shield(future)
+
+            # STATUS_LINESにないステータスコードの扱いをWSGIHandlerと揃える
+            self.validate_status_code(response.status_code)
+            status_code = response.status_code
+            # ヘッダーの値はencode_header_valueで変換済みのため、latin-1でエンコードするとUTF-8のバイト列になる
+            headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in self.build_response_headers(response)]
+            response_body = response.body
+
+        except Exception:
+            # リクエストの処理中に例外が発生した場合は、
+            # コンソールにエラーログを出力し500を返す
+            print("=== ASGIHandler: リクエストの処理中にエラーが発生しました ===")
+            traceback.print_exc()
+
+            status_code = 500
+            response_body = b"<html><body><h1>500 Internal Server Error</h1></body></html>"
+            headers = [(b"content-length", str(len(response_body)).encode()), (b"content-type", b"text/html; charset=UTF-8")]
+
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": response_body})
+
+    async def handle_lifespan(self, receive: Callable[[], Awaitable[dict]], send: Callable[[dict], Awaitable[None]]) -> None:
+        """
+        サーバーの起動/停止の通知に応答する
+        naoxでは起動/停止時に行う処理はないため、完了を返すだけ
+        """
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def read_body(self, receive: Callable[[], Awaitable[dict]]) -> Optional[bytes]:
+        """
+        http.requestメッセージを全て受け取り、リクエストボディを返す
+        受信中にクライアントが切断した場合はNoneを返す
+        """
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    def build_request(self, scope: dict, body: bytes) -> HTTPRequest:
+        """
+        ASGIのscopeからHTTPRequestを生成する
+        """
+        # Workerと同じく、pathにはクエリ文字列も含める
+        path = scope["path"]
+        if scope.get("query_string"):
+            path += "?" + scope["query_string"].decode("latin-1")
+
+        # ヘッダー名は小文字で渡されるため、ブラウザが送信する形式に揃える
+        # 同じ名前のヘッダーが複数ある場合は1つにまとめる(Cookieは"; "、それ以外は", "区切り)
+        # Workerと同じく、ヘッダーの値はUTF-8としてデコードする
+        headers = {}
+        for name, value in scope.get("headers", []):
+            header_name = self.normalize_header_name(name.decode("latin-1"))
+            header_value = value.decode("utf-8")
+            if header_name in headers:
+                separator = "; " if header_name == "Cookie" else ", "
+                header_value = headers[header_name] + separator + header_value
+            headers[header_name] = header_value
+
+        request = self.REQUEST_POOL.acquire()
+        request.method = scope["method"]
+        request.path = path
+        request.http_version = f"HTTP/{scope.get('http_version', '1.1')}"
+        request.body = body
+        request.headers = headers
+
+        return request
@@ -0,0 +1,153 @@
+import textwrap
+from http import HTTPStatus
+from typing import List, Tuple
+
+from pyweb.http.request import HTTPRequest, HTTPRequestPool
+from pyweb.http.response import HTTPResponse
+from pyweb.urls.resolver import URLResolver
+
+
+class BaseHandler:
+    """
+    HTTPRequestからHTTPResponseを生成する処理をまとめたクラス
+    Worker(naoxのサーバー)とWSGI/ASGIのアダプターで共通して使用する
+    """
+
+    # 拡張子とMIME Typeの対応
+    # ブラウザで日本語を表示させる為、日本語に対応したエンコーディングを指定
+    MIME_TYPES = {
+        "html": "text/html; charset=UTF-8",
+        "css": "text/css",
+        "png": "image/png",
+        "jpg": "image/jpg",
+        "gif": "image/gif",
+        "csv": "text/csv",
+    }
+
+    # ステータスコードとステータスラインの対応
+    STATUS_LINES = {
+        200: "200 OK",
+        302: "302 Found",
+        404: "404 Not Found",
+        405: "405 Method Not Allowed",
+    }
+
+    # HTTPRequestはリクエスト毎に生成せず、全てのハンドラーで共有するプールから使い回す
+    REQUEST_POOL = HTTPRequestPool()
+
+    def get_response(self, request: HTTPRequest) -> HTTPResponse:
+        """
+        URL解決を行い、viewを呼び出してレスポンスを生成する
+        """
+        # URL解決を行う
+        view = URLResolver().resolve(request)
+
+        # レスポンスを生成する
+        response = view(request)
+
+        # レスポンスボディを変換
+        # bodyがstr型の場合、bytes型へ変換
+        if isinstance(response.body, str):
+            response.body = textwrap.dedent(response.body).encode()
+
+        # Content-Typeが指定されていない場合はpathから特定する
+        if response.content_type is None:
+            response.content_type = self.guess_content_type(request.path)
+
+        return response
+
+    def validate_status_code(self, status_code: int) -> None:
+        """
+        STATUS_LINESにもHTTPStatusにもないステータスコードの場合はValueErrorを送出する
+        """
+        if status_code in self.STATUS_LINES:
+            return
+        try:
+            HTTPStatus(status_code)
+        except ValueError:
+            raise ValueError(f"対応していないステータスコードです status_code: {status_code}") from None
+
+    def get_status_line(self, status_code: int) -> str:
+        """
+        ステータスコードからステータスラインを取得する
+        STATUS_LINESにないステータスコードはHTTPStatusの説明句を使う
+        """
+        self.validate_status_code(status_code)
+        if status_code in self.STATUS_LINES:
+            return self.STATUS_LINES[status_code]
+        return f"{status_code} {HTTPStatus(status_code).phrase}"
+
+    def guess_content_type(self, path: str) -> str:
+        """
+        pathの拡張子からContent-Typeを特定する
+        """
+        # pathから拡張子を取得
+        if "." in path:
+            ext = path.rsplit(".", maxsplit=1)[-1]
+            # 拡張子からMIME Typeを取得
+            # 対応していない拡張子の場合、octet-streamとする
+            return self.MIME_TYPES.get(ext, "application/octet-stream")
+
+        # pathに拡張子がない場合はhtml扱いとする
+        return "text/html; charset=UTF-8"
+
+    def build_response_headers(self, response: HTTPResponse) -> List[Tuple[str, str]]:
+        """
+        レスポンスヘッダーを(ヘッダー名, 値)のlistとして構築する
+        DateやConnectionなど、コネクションに関わるヘッダーはサーバー側で付与する
+        値はencode_header_valueで変換済みのため、latin-1でエンコードして送信する
+        """
+        headers = [
+            ("Content-Length", str(len(response.body))),
+            ("Content-Type", response.content_type),
+        ]
+
+        # Cookieヘッダーの生成
+        for cookie in response.cookies:
+            cookie_header = f"{cookie.name}={cookie.value}"
+            if cookie.expires is not None:
+                cookie_header += f"; Expires={cookie.expires.strftime('%a, %d %b %Y %H:%M:%S GMT')}"
+            if cookie.max_age is not None:
+                cookie_header += f"; Max-Age={cookie.max_age}"
+            if cookie.domain:
+                cookie_header += f"; Domain={cookie.domain}"
+            if cookie.path:
+                cookie_header += f"; Path={cookie.path}"
+            if cookie.secure:
+                cookie_header += "; Secure"
+            if cookie.http_only:
+                cookie_header += "; HttpOnly"
+
+            headers.append(("Set-Cookie", cookie_header))
+
+        # その他ヘッダーの生成
+        headers.extend(response.headers.items())
+
+        # Workerのf-stringと同じく、数値などstr以外の値も文字列に変換してから送信する
+        return [(name, self.encode_header_value(str(value))) for name, value in headers]
+
+    @staticmethod
+    def encode_header_value(value: str) -> str:
+        """
+        ヘッダーの値をUTF-8のバイト列に変換し、1バイトを1文字としたlatin-1の文字列で返す
+        WSGIではヘッダーをlatin-1で表せる文字列で渡す必要があるため(PEP 3333)、
+        日本語を含むCookieなども、この形でUTF-8のまま送信する
+        ex) "ナオキ" => "ã\x83\x8aã\x82ªã\x82\xad"
+        """
+        return value.encode("utf-8").decode("latin-1")
+
+    @staticmethod
+    def decode_header_value(value: str) -> str:
+        """
+        encode_header_valueの逆変換
+        WSGIのenvironで渡されるlatin-1の文字列を、UTF-8として解釈し直す
+        """
+        return value.encode("latin-1").decode("utf-8")
+
+    @staticmethod
+    def normalize_header_name(name: str) -> str:
+        """
+        WSGI/ASGIで渡されるヘッダー名を、ブラウザが送信する形式に揃える
+        ex) "HTTP_USER_AGENT" => "User-Agent", "cookie" => "Cookie"
+        """
+        return "-".join(part.capitalize() for part in name.replace("_", "-").split("-"))
@@ -0,0 +1,81 @@
+import sys
+import traceback
+from typing import Callable, Iterable, List, Tuple
+
+from pyweb.handlers.base import BaseHandler
+from pyweb.http.request import HTTPRequest
+
+
+class WSGIHandler(BaseHandler):
+    """
+    URLResolverとviewをWSGIアプリケーションとして呼び出せるようにするクラス
+    gunicornなどのWSGIサーバーや、テストクライアントから呼び出される
+    """
+
+    def __call__(self, environ: dict, start_response: Callable[[str, List[Tuple[str, str]]], None]) -> Iterable[bytes]:
+        """
+        environからHTTPRequestを生成し、viewのHTTPResponseをWSGIの形式に変換して返す
+        """
+        request = None
+        try:
+            request = self.build_request(environ)
+            response = self.get_response(request)
+
+            status = self.get_status_line(response.status_code)
+            start_response(status, self.build_response_headers(response))
+
+            return [response.body]
+
+        except Exception:
+            # リクエストの処理中に例外が発生した場合は、
+            # コンソールにエラーログを出力し500を返す
+            print("=== WSGIHandler: リクエストの処理中にエラーが発生しました ===")
+            traceback.print_exc()
+
+            # start_responseを2回呼び出す場合は、exc_infoを渡す必要がある(PEP 3333)
+            body = b"<html><body><h1>500 Internal Server Error</h1></body></html>"
+            start_response(
+                "500 Internal Server Error",
+                [("Content-Length", str(len(body))), ("Content-Type", "text/html; charset=UTF-8")],
+                sys.exc_info(),
+            )
+            return [body]
+
+        finally:
+            # 使い終わったHTTPRequestはリセットしてプールへ戻す
+            self.REQUEST_POOL.release(request)
+
+    def build_request(self, environ: dict) -> HTTPRequest:
+        """
+        WSGIのenvironからHTTPRequestを生成する
+        """
+        # PATH_INFOはlatin-1でデコードされた文字列で渡されるため、UTF-8でデコードし直す
+        # Workerと同じく、pathにはクエリ文字列も含める
+        path = environ.get("PATH_INFO", "/").encode("latin-1").decode("utf-8")
+        if environ.get("QUERY_STRING"):
+            path += "?" + environ["QUERY_STRING"]
+
+        # HTTP_から始まるキーと、CONTENT_TYPE, CONTENT_LENGTHをヘッダーとして扱う
+        # Workerと同じく、ヘッダーの値はUTF-8としてデコードする
+        headers = {}
+        for key, value in environ.items():
+            if key.startswith("HTTP_"):
+                headers[self.normalize_header_name(key[5:])] = self.decode_header_value(value)
+            elif key in ("CONTENT_TYPE", "CONTENT_LENGTH") and value:
+                headers[self.normalize_header_name(key)] = self.decode_header_value(value)
+
+        # リクエストボディを取得
+        try:
+            content_length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            content_length = 0
+        body = environ["wsgi.input"].read(content_length) if content_length > 0 else b""
+
+        request = self.REQUEST_POOL.acquire()
+        request.method = environ.get("REQUEST_METHOD", "GET")
+        request.path = path
+        request.http_version = environ.get("SERVER_PROTOCOL", "HTTP/1.1")
+        request.body = body
+        request.headers = headers
+
+        return request
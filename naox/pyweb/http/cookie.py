@@ -3,7 +3,7 @@ from typing import Optional
 
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class Cookie:
     name: str
     value: str
@@ -1,49 +1,175 @@
-from dataclasses import dataclass, field
+import re
+from threading import Lock
+from typing import List, Optional, Union
+
 
-# dataclassデコレーターを使用するとinitメソッドを書かなくても良くなる
-# データ型を定義する時には、@dataclassを使用すると良い
-@dataclass
 class HTTPRequest:
-    path: str = ""
-    method: str = ""
-    http_version: str = ""
-    body: bytes = b""
-    headers: dict = field(default_factory=dict)
-    cookies: dict = field(default_factory=dict)
-    params: dict = field(default_factory=dict)
-
-# class HTTPRequest:
-#     path: str
-#     method: str
-#     http_version: str
-#     headers: dict
-#     cookies: dict
-#     body: bytes
-#     params: dict
-
-#     def __init__(
-#         self,
-#         path: str = "",
-#         method: str = "",
-#         http_version: str = "",
-#         headers: dict = None,
-#         cookies: dict = None,
-#         body: bytes = b"",
-#         params: dict = None,
-#     ):
-#         # Noneをデフォルト値にしたのは、
-#         # 関数呼び出しの際にデフォルト値を共有しないようにするため
-#         if headers is None:
-#             headers = {}
-#         if cookies is None:
-#             cookies = {}
-#         if params is None:
-#             params = {}
-# 
-#         self.path = path
-#         self.method = method
-#         self.http_version = http_version
-#         self.headers = headers
-#         self.cookies = cookies
-#         self.body = body
-#         self.params = params
\ No newline at end of file
+    """
+    HTTPリクエストを表すクラス
+
+    インスタンスはHTTPRequestPoolから取り出して使い、処理が終わったらreset()してプールへ戻す
+    __slots__で__dict__を持たないようにして、インスタンスのサイズを小さくしている
+    ヘッダーは受信バッファのview(memoryview)のまま保持しておき、
+    headers/cookiesに初めてアクセスされた時にパースする
+    """
+
+    __slots__ = ("path", "method", "http_version", "body", "params", "_raw_headers", "_headers", "_cookies")
+
+    path: str
+    method: str
+    http_version: str
+    body: bytes
+    params: dict
+
+    def __init__(
+        self,
+        path: str = "",
+        method: str = "",
+        http_version: str = "",
+        body: bytes = b"",
+        headers: dict = None,
+        cookies: dict = None,
+        params: dict = None,
+        raw_headers: Union[bytes, memoryview] = b"",
+    ):
+        # Noneをデフォルト値にしたのは、
+        # 関数呼び出しの際にデフォルト値を共有しないようにするため
+        if params is None:
+            params = {}
+
+        self.path = path
+        self.method = method
+        self.http_version = http_version
+        self.body = body
+        self.params = params
+        self._raw_headers = raw_headers
+        # Noneの場合は未パースを表す
+        self._headers = headers
+        self._cookies = cookies
+
+    def __repr__(self) -> str:
+        return f"HTTPRequest(method={self.method!r}, path={self.path!r}, http_version={self.http_version!r})"
+
+    @property
+    def headers(self) -> dict:
+        if self._headers is None:
+            self._headers = self.parse_headers(self._raw_headers)
+            # パースした後は受信バッファへの参照を手放す
+            self._raw_headers = b""
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers: dict) -> None:
+        self._headers = headers
+        self._raw_headers = b""
+        # Cookieはヘッダーからパースし直す
+        self._cookies = None
+
+    @property
+    def cookies(self) -> dict:
+        if self._cookies is None:
+            self._cookies = self.parse_cookies(self.headers.get("Cookie", ""))
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, cookies: dict) -> None:
+        self._cookies = cookies
+
+    def set_raw_headers(self, raw_headers: Union[bytes, memoryview]) -> None:
+        """
+        パース前のヘッダーを設定する
+        """
+        self._raw_headers = raw_headers
+        self._headers = None
+        self._cookies = None
+
+    def reset(self) -> None:
+        """
+        プールに戻す前に、前のリクエストの内容を消去する
+        params辞書は中身だけを消去して使い回す
+        """
+        self.path = ""
+        self.method = ""
+        self.http_version = ""
+        self.body = b""
+        self.params.clear()
+        self._raw_headers = b""
+        self._headers = None
+        self._cookies = None
+
+    @staticmethod
+    def parse_headers(raw_headers: Union[bytes, memoryview]) -> dict:
+        """
+        リクエストヘッダーを辞書にパースする
+        """
+        headers = {}
+        if not raw_headers:
+            return headers
+
+        # CRLFでsplit
+        # memoryviewのままstr()でデコードし、bytesのコピーを作らない
+        for header_row in str(raw_headers, "utf-8").split("\r\n"):
+            # 正規表現の1つの":"と、0個以上の空白でsplit
+            key, value = re.split(r": *", header_row, maxsplit=1)
+            headers[key] = value
+        return headers
+
+    @staticmethod
+    def parse_cookies(cookie_header: str) -> dict:
+        """
+        Cookieヘッダーを辞書にパースする
+        """
+        cookies = {}
+        if not cookie_header:
+            return cookies
+
+        # str から list へ変換
+        # "name1=value1; name2=value2" => ["name1=value1", "name2=value2"]
+        # Cookieは1つと限らない。複数の場合は;区切りで渡される。
+        # list から dict へ変換
+        # ["name1=value1", "name2=value2"] => {"name1": "value1", "name2": "value2"}
+        for cookie_string in cookie_header.split("; "):
+            name, value = cookie_string.split("=", maxsplit=1)
+            cookies[name] = value
+        return cookies
+
+
+class HTTPRequestPool:
+    """
+    HTTPRequestインスタンスを使い回すためのプール
+    複数のWorkerスレッドから使われるため、Lockで排他制御する
+    """
+
+    _pool: List[HTTPRequest]
+    max_size: int
+
+    def __init__(self, max_size: int = 64):
+        self._pool = []
+        self._lock = Lock()
+        self.max_size = max_size
+
+    def __len__(self) -> int:
+        return len(self._pool)
+
+    def acquire(self) -> HTTPRequest:
+        """
+        プールからHTTPRequestを取り出す
+        プールが空の場合は新しく生成する
+        """
+        with self._lock:
+            if self._pool:
+                return self._pool.pop()
+        return HTTPRequest()
+
+    def release(self, request: Optional[HTTPRequest]) -> None:
+        """
+        HTTPRequestをリセットしてプールへ戻す
+        プールが上限に達している場合は破棄する
+        """
+        if request is None:
+            return
+
+        request.reset()
+        with self._lock:
+            if len(self._pool) < self.max_size:
+                self._pool.append(request)
@@ -3,7 +3,8 @@ from dataclasses import dataclass, field
 
 from pyweb.http.cookie import Cookie
 
-@dataclass
+# slots=Trueで__dict__を持たないクラスにし、インスタンス毎のメモリ使用量を抑える
+@dataclass(slots=True)
 class HTTPResponse:
     body: Union[bytes, str] = b""
     content_type: Optional[str] = None # str型またはNoneを表す型 Nullable型
@@ -1,5 +1,9 @@
 import socket
+import ssl
+from threading import Event
+from typing import Optional, Tuple
 
+import settings
 from pyweb.server.worker import Worker
 
 class Server:
@@ -7,6 +11,19 @@ class Server:
     TCP通信を行うサーバーを表すクラス
     """
 
+    host: str
+    port: int
+    server_socket: Optional[socket.socket]
+
+    def __init__(self, host: str = "localhost", port: int = 8080):
+        # portに0を指定するとOSが空いているポートを割り当てる
+        self.host = host
+        self.port = port
+        self.server_socket = None
+        # server_socketが接続を受け付けられる状態になったことを通知する
+        self.ready = Event()
+        self.is_shutdown = False
+
     def serve(self):
         """
         サーバーを起動する
@@ -17,6 +34,11 @@ class Server:
         try:
             # socketを生成
             server_socket = self.create_server_socket()
+            self.server_socket = server_socket
+            # TLSの設定がある場合はSSLContextを生成
+            # SSLContextはセッションキャッシュとチケット鍵を保持するため、全てのコネクションで共有する
+            ssl_context = self.create_ssl_context()
+            self.ready.set()
 
             # 1つのリクエストの処理が完了し、コネクションを終了後、
             # ループの先頭にもどり再度リクエストを待機する。
@@ -26,17 +48,52 @@ class Server:
                 print("=== Server: クライアントからの接続を待ちます ===")
                 # 返り値はクライアントとの接続が確立された新しいsocketインスタンスとクライアントアドレス
                 # server_socketは次のコネクションを受け付ける
-                (client_socket, address) = server_socket.accept()
+                try:
+                    (client_socket, address) = server_socket.accept()
+                except OSError:
+                    # shutdown()でserver_socketが閉じられた場合はループを抜ける
+                    if self.is_shutdown:
+                        break
+                    raise
                 print(f"=== Server: クライアントとの接続が完了しました(コネクションが確立する) remote_address: {address} ===")
 
-                # クライアントを処理するスレッドを作成
-                thread = Worker(client_socket, address)
-                # 新規スレッドを作成 start()でスレッドが作成されると同時にrun()が実行される
-                thread.start()
+                self.handle_connection(client_socket, address, ssl_context)
 
         finally:
             print("=== Server: サーバーを停止します。 ===")
 
+    def shutdown(self) -> None:
+        """
+        serve()のループを終了させる
+        """
+        self.is_shutdown = True
+        if self.server_socket is not None:
+            # close()だけでは別スレッドでブロックしているaccept()が戻らないため、先にshutdownする
+            try:
+                self.server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.server_socket.close()
+
+    def handle_connection(
+        self, client_socket: socket.socket, address: Tuple[str, int], ssl_context: Optional[ssl.SSLContext]
+    ) -> Worker:
+        """
+        接続済みのsocketを処理するWorkerスレッドを起動する
+        """
+        if ssl_context is not None:
+            # ハンドシェイクに時間がかかってもaccept()をブロックしないように、
+            # ここではsocketをラップするだけにして、ハンドシェイクはWorkerで行う
+            client_socket = ssl_context.wrap_socket(
+                client_socket, server_side=True, do_handshake_on_connect=False
+            )
+
+        # クライアントを処理するスレッドを作成
+        thread = Worker(client_socket, address)
+        # 新規スレッドを作成 start()でスレッドが作成されると同時にrun()が実行される
+        thread.start()
+        return thread
+
     def create_server_socket(self) -> socket:
         """
         通信を待ち受けるためのserver_socketを生成する
@@ -48,11 +105,42 @@ class Server:
         # 連続してプログラムが起動できなくなってしまうため、設定を変更しています。
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
 
-        # socketをlocalhostのポート8080番に割り当てる
+        # socketをhostのportに割り当てる(デフォルトはlocalhostのポート8080番)
         # ======================================
         # プログラム内で予約
-        server_socket.bind(("localhost", 8080))
+        server_socket.bind((self.host, self.port))
         # 割り当ての実行(占有)　他のプログラムは使えなくなる
         # 引数は同時に受け付けるクライアントの数
         server_socket.listen(10)
-        return server_socket
\ No newline at end of file
+        return server_socket
+
+    def create_ssl_context(self) -> Optional[ssl.SSLContext]:
+        """
+        settingsのTLS設定からサーバー用のSSLContextを生成する
+        証明書か秘密鍵が設定されていない場合はNoneを返す
+        """
+        certfile = getattr(settings, "SSL_CERTFILE", None)
+        keyfile = getattr(settings, "SSL_KEYFILE", None)
+        if certfile is None or keyfile is None:
+            return None
+
+        ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ssl_context.minimum_version = ssl.TLSVersion.TLSv1_2
+        ssl_context.load_cert_chain(certfile=certfile, keyfile=keyfile)
+
+        # セッション再開(resumption)の設定
+        # サーバー側のセッションキャッシュはデフォルトで有効なので、チケットの発行有無のみ切り替える
+        session_tickets = getattr(settings, "SSL_SESSION_TICKETS", 2)
+        if session_tickets > 0:
+            ssl_context.options &= ~ssl.OP_NO_TICKET
+            ssl_context.num_tickets = session_tickets
+        else:
+            ssl_context.options |= ssl.OP_NO_TICKET
+            ssl_context.num_tickets = 0
+
+        # ALPNで提示するプロトコルを設定
+        alpn_protocols = getattr(settings, "SSL_ALPN_PROTOCOLS", [])
+        if alpn_protocols:
+            ssl_context.set_alpn_protocols(alpn_protocols)
+
+        return ssl_context
@@ -1,39 +1,20 @@
-import re
+import ssl
 import traceback
-import textwrap
 from datetime import datetime
 from socket import socket
 from threading import Thread
 from typing import Tuple
 
+import settings
+from pyweb.handlers.base import BaseHandler
 from pyweb.http.request import HTTPRequest
 from pyweb.http.response import HTTPResponse
-from pyweb.urls.resolver import URLResolver
 
-class Worker(Thread):
+class Worker(Thread, BaseHandler):
     """
     TCP通信を行うサーバーを表すクラス
     """
 
-    # 拡張子とMIME Typeの対応
-    # ブラウザで日本語を表示させる為、日本語に対応したエンコーディングを指定
-    MIME_TYPES = {
-        "html": "text/html; charset=UTF-8",
-        "css": "text/css",
-        "png": "image/png",
-        "jpg": "image/jpg",
-        "gif": "image/gif",
-        "csv": "text/csv",
-    }
-
-    # ステータスコードとステータスラインの対応
-    STATUS_LINES = {
-        200: "200 OK",
-        302: "302 Found",
-        404: "404 Not Found",
-        405: "405 Method Not Allowed",
-    }
-
     def __init__(self, client_socket: socket, address: Tuple[str, int]):
         super().__init__()
 
@@ -45,7 +26,15 @@ class Worker(Thread):
         クライアントと接続済みのsocketを引数として受け取り、
         リクエストを処理してレスポンスを送信する
         """
+        request = None
         try:
+            # TLSの場合は、accept()のループをブロックしないようにWorkerでハンドシェイクを行う
+            if isinstance(self.client_socket, ssl.SSLSocket):
+                self.do_handshake()
+
+            # リクエストを送ってこないクライアントにスレッドを占有されないよう、受信のタイムアウトを設定する
+            self.client_socket.settimeout(getattr(settings, "RECV_TIMEOUT", None))
+
             # クライアントから送られてきたデータをbytes型で取得する
             # 引数はネットワークバッファ(到着したデータをためておく所)から一回で取得するバイト数。
             # recv()は呼び出した時点で溜まっているデータを、4096バイトずつ繰り返し取得し、全て取得する。
@@ -58,25 +47,19 @@ class Worker(Thread):
             # HTTPリクエストをパースする
             request = self.parse_http_request(request_bytes)
 
-            # URL解決を行う
-            view = URLResolver().resolve(request)
-
-            # レスポンスを生成する
-            response = view(request)
-
-            # レスポンスボディを変換
-            # bodyがstr型の場合、bytes型へ変換
-            if isinstance(response.body, str):
-                response.body = textwrap.dedent(response.body).encode()
+            # URL解決を行い、レスポンスを生成する
+            response = self.get_response(request)
 
             # レスポンスラインを生成
             response_line = self.build_response_line(response)
 
             # レスポンスヘッダーを生成
-            response_header = self.build_response_header(request, response)
+            response_header = self.build_response_header(response)
 
             # ヘッダーとボディを空行で結合した後bytesに変換し、レスポンス全体を生成
-            response_bytes = (response_line + response_header + "\r\n").encode() + response.body
+            # ヘッダーの値はencode_header_valueでUTF-8のバイト列を表すlatin-1の文字列になっているため、
+            # latin-1でエンコードするとUTF-8のバイト列になる
+            response_bytes = (response_line + response_header + "\r\n").encode("latin-1") + response.body
 
             # クライアントへレスポンスを送信する
             self.client_socket.send(response_bytes)
@@ -91,6 +74,23 @@ class Worker(Thread):
             # 例外が発生した場合も、発生しなかった場合も、TCP通信のcloseは行う
             print(f"=== Worker: クライアントとの通信を終了します remote_address: {self.client_address} ===")
             self.client_socket.close()
+            # 使い終わったHTTPRequestはリセットしてプールへ戻す
+            self.REQUEST_POOL.release(request)
+
+    def do_handshake(self) -> None:
+        """
+        クライアントとのTLSハンドシェイクを行う
+        """
+        # ハンドシェイクが終わらないクライアントにスレッドを占有されないよう、タイムアウトを設定する
+        self.client_socket.settimeout(getattr(settings, "SSL_HANDSHAKE_TIMEOUT", None))
+        self.client_socket.do_handshake()
+
+        print(
+            f"=== Worker: TLSハンドシェイクが完了しました "
+            f"version: {self.client_socket.version()}, "
+            f"alpn: {self.client_socket.selected_alpn_protocol()}, "
+            f"session_reused: {self.client_socket.session_reused} ==="
+        )
 
     def parse_http_request(self, request: bytes) -> HTTPRequest:
         """
@@ -98,9 +98,10 @@ class Worker(Thread):
         1. method: str
         2. path: str
         3. http_version: str
-        4. request_header: dict
+        4. request_header: memoryview(パース前の受信バッファのview)
         5. request_body: bytes
-        に分割/変換する
+        に分割/変換し、プールから取り出したHTTPRequestに設定する
+        ヘッダーの辞書へのパースは、HTTPRequest.headersに初めてアクセスされた時に行う
         """
 
         # リクエスト全体を
@@ -109,88 +110,45 @@ class Worker(Thread):
         # 3. リクエストボディ(空行〜)にパースする
         # ボディは画像やPDFなど、文字列ではなくバイナリデータが
         # 送られてくる可能性があるためバイナリのまま扱う
-        request_line, remain = request.split(b"\r\n", maxsplit=1)
-        request_header, request_body = remain.split(b"\r\n\r\n", maxsplit=1)
+        # ヘッダーはmemoryviewでスライスし、受信バッファをコピーせずにHTTPRequestへ渡す
+        # ヘッダーの辞書へのパースは、HTTPRequest.headersに初めてアクセスされた時に行う
+        line_end = request.index(b"\r\n")
+        header_end = request.index(b"\r\n\r\n", line_end)
+        buffer = memoryview(request)
 
         # リクエストラインをパースする
-        method, path, http_version = request_line.decode().split(" ")
-
-        # リクエストヘッダーを辞書にパースする
-        headers = {}
-        # CRLFでsplit
-        for header_row in request_header.decode().split("\r\n"):
-            # 正規表現の1つの":"と、0個以上の空白でsplit
-            key, value = re.split(r": *", header_row, maxsplit=1)
-            headers[key] = value
-
-        cookies = {}
-        if "Cookie" in headers:
-            # str から list へ変換 
-            # "name1=value1; name2=value2" => ["name1=value1", "name2=value2"]
-            # Cookieは1つと限らない。複数の場合は;区切りで渡される。
-            cookie_strings = headers["Cookie"].split("; ")
-            # list から dict へ変換
-            # ["name1=value1", "name2=value2"] => {"name1": "value1", "name2": "value2"}
-            for cookie_string in cookie_strings:
-                name, value = cookie_string.split("=", maxsplit=1)
-                cookies[name] = value
-
-        return HTTPRequest(method=method, path=path, http_version=http_version, headers=headers, cookies=cookies, body=request_body)
+        method, path, http_version = str(buffer[:line_end], "utf-8").split(" ")
+
+        http_request = self.REQUEST_POOL.acquire()
+        http_request.method = method
+        http_request.path = path
+        http_request.http_version = http_version
+        http_request.body = request[header_end + 4:]
+        http_request.set_raw_headers(buffer[line_end + 2:header_end])
+
+        return http_request
 
     def build_response_line(self, response: HTTPResponse) -> str:
         """
         レスポンスラインを構築する
         """
-        status_line = self.STATUS_LINES[response.status_code]
+        status_line = self.get_status_line(response.status_code)
         return f"HTTP/1.1 {status_line}"
 
-    def build_response_header(self, request: HTTPRequest, response: HTTPResponse) -> str:
+    def build_response_header(self, response: HTTPResponse) -> str:
         """
         レスポンスヘッダーを構築する
         """
-
-        # ヘッダー生成の為、Content-Typeを取得
-        # Content-Typeが指定されていない場合はpathから特定する
-        if response.content_type is None:
-            # pathから拡張子を取得
-            if "." in request.path:
-                ext = request.path.rsplit(".", maxsplit=1)[-1]
-                # 拡張子からMIME Typeを取得
-                # 対応していない拡張子の場合、octet-streamとする
-                response.content_type = self.MIME_TYPES.get(ext, "application/octet-stream")
-            else:
-                # pathに拡張子がない場合はhtml扱いとする
-                response.content_type = "text/html; charset=UTF-8"
-
-        # レスポンスヘッダーを生成
+        # 文字列の+=による中間オブジェクトを作らないよう、各行をlistに溜めて最後にjoinする
         # 基本ヘッダーの生成
-        response_header = ""
-        response_header += f"Date: {datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')}\r\n"
-        response_header += "Host: Naox/0.6\r\n"
-        response_header += f"Content-Length: {len(response.body)}\r\n"
-        response_header += "Connection: Close\r\n"
-        response_header += f"Content-Type: {response.content_type}\r\n"
-
-        # Cookieヘッダーの生成
-        for cookie in response.cookies:
-            cookie_header = f"Set-Cookie: {cookie.name}={cookie.value}"
-            if cookie.expires is not None:
-                cookie_header += f"; Expires={cookie.expires.strftime('%a, %d %b %Y %H:%M:%S GMT')}"
-            if cookie.max_age is not None:
-                cookie_header += f"; Max-Age={cookie.max_age}"
-            if cookie.domain:
-                cookie_header += f"; Domain={cookie.domain}"
-            if cookie.path:
-                cookie_header += f"; Path={cookie.path}"
-            if cookie.secure:
-                cookie_header += "; Secure"
-            if cookie.http_only:
-                cookie_header += "; HttpOnly"
-
-            response_header += cookie_header + "\r\n"
-
-        # その他ヘッダーの生成
-        for header_name, header_value in response.headers.items():
-            response_header += f"{header_name}: {header_value}\r\n"
-
-        return response_header
\ No newline at end of file
+        header_rows = [
+            f"Date: {datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')}",
+            "Host: Naox/0.6",
+            "Connection: Close",
+        ]
+
+        # Content-Type, Cookieなど、レスポンスの内容から決まるヘッダーの生成
+        for header_name, header_value in self.build_response_headers(response):
+            header_rows.append(f"{header_name}: {header_value}")
+
+        return "\r\n".join(header_rows) + "\r\n"
\ No newline at end of file
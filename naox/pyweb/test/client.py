@@ -0,0 +1,154 @@
+import io
+import urllib.parse
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from pyweb.handlers.base import BaseHandler
+from pyweb.handlers.wsgi import WSGIHandler
+from pyweb.http.cookie import Cookie
+from pyweb.http.response import HTTPResponse
+
+
+class Client:
+    """
+    socketを使わずに、プロセス内でリクエストを処理するテスト用のクライアント
+    WSGIHandlerを直接呼び出すため、TCP通信のオーバーヘッドなしでURL解決からviewまでを実行できる
+
+    ブラウザと同じように、レスポンスで受け取ったCookieを保持し、次のリクエストで送信する
+    """
+
+    cookies: dict
+
+    def __init__(self, handler: Callable[[dict, Callable], Iterable[bytes]] = None):
+        # WSGIHandlerのほか、wsgiref.validate.validatorでラップしたものなど、任意のWSGIアプリケーションを渡せる
+        if handler is None:
+            handler = WSGIHandler()
+
+        self.handler = handler
+        self.cookies = {}
+
+    def get(self, path: str, headers: dict = None) -> HTTPResponse:
+        """
+        GETリクエストを送信する
+        """
+        return self.request("GET", path, headers=headers)
+
+    def post(self, path: str, data: dict = None, headers: dict = None) -> HTTPResponse:
+        """
+        dataをURLエンコードしてPOSTリクエストを送信する
+        """
+        body = urllib.parse.urlencode(data or {}).encode()
+        headers = {"Content-Type": "application/x-www-form-urlencoded", **(headers or {})}
+        return self.request("POST", path, body=body, headers=headers)
+
+    def request(self, method: str, path: str, body: bytes = b"", headers: dict = None) -> HTTPResponse:
+        """
+        リクエストを送信し、レスポンスをHTTPResponseとして返す
+        """
+        environ = self.build_environ(method, path, body, headers or {})
+
+        status_and_headers = []
+
+        def start_response(status: str, response_headers: List[Tuple[str, str]], exc_info=None) -> None:
+            # エラー時にexc_info付きで再度呼ばれた場合は、ステータスとヘッダーを置き換える(PEP 3333)
+            status_and_headers[:] = [status, response_headers]
+
+        # WSGIの仕様に従い、closeメソッドを持つiterableは読み終えた後に必ずcloseする
+        app_iter = self.handler(environ, start_response)
+        try:
+            response_body = b"".join(app_iter)
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+        status, response_headers = status_and_headers
+
+        return self.build_response(status, response_headers, response_body)
+
+    def build_environ(self, method: str, path: str, body: bytes, headers: dict) -> dict:
+        """
+        リクエストの内容からWSGIのenvironを生成する
+        """
+        path_info, _, query_string = path.partition("?")
+
+        environ = {
+            "REQUEST_METHOD": method,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": path_info.encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": query_string,
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "REMOTE_ADDR": "127.0.0.1",
+            "CONTENT_LENGTH": str(len(body)) if body else "",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": io.StringIO(),
+            "wsgi.multithread": False,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+            "HTTP_HOST": "testserver",
+        }
+
+        # WSGIの仕様に合わせ、ヘッダーの値はUTF-8のバイト列を表すlatin-1の文字列で渡す
+        if self.cookies:
+            cookie_header = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+            environ["HTTP_COOKIE"] = BaseHandler.encode_header_value(cookie_header)
+
+        for name, value in headers.items():
+            key = name.upper().replace("-", "_")
+            value = BaseHandler.encode_header_value(value)
+            if key in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                environ[key] = value
+            else:
+                environ[f"HTTP_{key}"] = value
+
+        return environ
+
+    def build_response(self, status: str, response_headers: List[Tuple[str, str]], body: bytes) -> HTTPResponse:
+        """
+        WSGIのステータスとヘッダーからHTTPResponseを生成する
+        Set-CookieヘッダーはCookieに変換してHTTPResponse.cookiesに格納し、クライアントにも保持する
+        """
+        headers = {}
+        cookies = []
+        content_type: Optional[str] = None
+
+        for name, value in response_headers:
+            value = BaseHandler.decode_header_value(value)
+            if name == "Content-Type":
+                content_type = value
+            elif name == "Set-Cookie":
+                cookie = self.parse_set_cookie(value)
+                cookies.append(cookie)
+                self.cookies[cookie.name] = cookie.value
+            else:
+                headers[name] = value
+
+        status_code = int(status.split(" ", maxsplit=1)[0])
+
+        return HTTPResponse(body=body, content_type=content_type, status_code=status_code, headers=headers, cookies=cookies)
+
+    @staticmethod
+    def parse_set_cookie(set_cookie: str) -> Cookie:
+        """
+        Set-Cookieヘッダーの値をCookieに変換する
+        """
+        pair, *attributes = set_cookie.split("; ")
+        name, value = pair.split("=", maxsplit=1)
+        cookie = Cookie(name=name, value=value)
+
+        for attribute in attributes:
+            key, _, attribute_value = attribute.partition("=")
+            key = key.lower()
+            if key == "max-age":
+                cookie.max_age = int(attribute_value)
+            elif key == "domain":
+                cookie.domain = attribute_value
+            elif key == "path":
+                cookie.path = attribute_value
+            elif key == "secure":
+                cookie.secure = True
+            elif key == "httponly":
+                cookie.http_only = True
+
+        return cookie
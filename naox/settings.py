@@ -7,4 +7,24 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
 # テンプレートファイルを置くディレクトリ
-TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
\ No newline at end of file
+TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+
+# TLSで使用する証明書と秘密鍵のパス
+# どちらかがNoneの場合はTLSを使用せず平文で通信する
+SSL_CERTFILE = None
+SSL_KEYFILE = None
+
+# TLS1.3で1回のハンドシェイクごとに発行するセッションチケットの枚数
+# 0を指定するとセッションチケットを発行しない(TLS1.2のチケットも無効になる)
+SSL_SESSION_TICKETS = 2
+
+# ALPNでクライアントに提示するプロトコル(優先度の高い順)
+SSL_ALPN_PROTOCOLS = ["http/1.1"]
+
+# TLSハンドシェイクのタイムアウト秒数
+# ハンドシェイクが終わらないクライアントにWorkerのスレッドを占有されないようにする
+SSL_HANDSHAKE_TIMEOUT = 10
+
+# クライアントからリクエストを受信する際のタイムアウト秒数(平文/TLS共通)
+# 接続後(TLSの場合はハンドシェイク後)に何も送ってこないクライアントにWorkerのスレッドを占有されないようにする
+RECV_TIMEOUT = 10
@@ -0,0 +1,213 @@
+import asyncio
+import threading
+import urllib.parse
+from wsgiref.validate import validator
+
+import pytest
+
+from pyweb.handlers.asgi import ASGIHandler
+from pyweb.handlers.wsgi import WSGIHandler
+from pyweb.http.response import HTTPResponse
+from pyweb.server.worker import Worker
+from pyweb.test.client import Client
+from pyweb.urls import resolver
+from pyweb.urls.pattern import URLPattern
+
+
+async def call_asgi(handler: ASGIHandler, method: str, path: str, body: bytes = b"", headers: list = None) -> list:
+    """
+    ASGIHandlerを呼び出し、sendに渡されたメッセージのlistを返す
+    ボディはmore_bodyで2回に分けて渡す
+    """
+    messages = [
+        {"type": "http.request", "body": body[:3], "more_body": True},
+        {"type": "http.request", "body": body[3:], "more_body": False},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "http_version": "1.1",
+        "headers": headers or [],
+    }
+    await handler(scope, receive, send)
+    return sent
+
+
+def test_client_login_and_welcome_with_cookies():
+    # validatorでPEP 3333に沿っていることも確認する
+    client = Client(validator(WSGIHandler()))
+
+    response = client.get("/welcome")
+    assert response.status_code == 302
+    assert response.headers["Location"] == "/login"
+
+    response = client.post("/login", {"username": "ナオキ", "email": "naoki@example.com"})
+    assert response.status_code == 302
+    assert response.headers["Location"] == "/welcome"
+    assert [(cookie.name, cookie.value, cookie.max_age) for cookie in response.cookies] == [
+        ("username", "ナオキ", 30),
+        ("email", "naoki@example.com", 30),
+    ]
+
+    response = client.get("/welcome")
+    assert response.status_code == 200
+    assert response.content_type == "text/html; charset=UTF-8"
+    assert "ようこそ！ ナオキ さん！" in response.body.decode()
+    assert "naoki@example.com" in response.body.decode()
+
+
+def test_client_url_parameters_and_static_files():
+    client = Client()
+
+    response = client.get("/user/42/profile")
+    assert response.status_code == 200
+    assert "ID: 42" in response.body.decode()
+
+    assert client.get("/parameters").status_code == 405
+    assert client.get("/index.css").content_type == "text/css"
+    assert client.get("/not_found.png").status_code == 404
+
+
+def test_asgi_login_and_welcome_round_trip():
+    handler = ASGIHandler()
+
+    body = urllib.parse.urlencode({"username": "ナオキ", "email": "naoki@example.com"}).encode()
+    sent = asyncio.run(call_asgi(handler, "POST", "/login", body, [(b"content-type", b"application/x-www-form-urlencoded")]))
+    start, response_body = sent
+    assert start["type"] == "http.response.start"
+    assert start["status"] == 302
+    # WorkerやWSGIHandlerと同じく、日本語を含むCookieはUTF-8のバイト列で送信される
+    assert (b"set-cookie", "username=ナオキ; Max-Age=30".encode()) in start["headers"]
+    assert (b"location", b"/welcome") in start["headers"]
+    assert response_body == {"type": "http.response.body", "body": b""}
+
+    # 複数のcookieヘッダーは1つにまとめられる
+    headers = [(b"cookie", "username=ナオキ".encode()), (b"cookie", b"email=naoki@example.com")]
+    start, response_body = asyncio.run(call_asgi(handler, "GET", "/welcome", headers=headers))
+    assert start["status"] == 200
+    assert "ようこそ！ ナオキ さん！" in response_body["body"].decode()
+
+
+def test_unknown_status_code_is_the_same_on_wsgi_and_asgi(monkeypatch):
+    def teapot(request):
+        return HTTPResponse(status_code=418, body=b"teapot")
+
+    monkeypatch.setattr(resolver, "url_patterns", {URLPattern("/teapot", teapot)})
+
+    assert Client().get("/teapot").status_code == 418
+
+    start, response_body = asyncio.run(call_asgi(ASGIHandler(), "GET", "/teapot"))
+    assert start["status"] == 418
+    assert response_body["body"] == b"teapot"
+
+
+def test_asgi_cancel_does_not_release_request_while_view_is_running(monkeypatch):
+    view_started = threading.Event()
+    finish_view = threading.Event()
+    seen_paths = []
+
+    def slow_view(request):
+        view_started.set()
+        finish_view.wait(timeout=5)
+        seen_paths.append(request.path)
+        return HTTPResponse(body=b"slow")
+
+    monkeypatch.setattr(resolver, "url_patterns", {URLPattern("/slow", slow_view)})
+    handler = ASGIHandler()
+
+    async def cancel_while_running():
+        task = asyncio.create_task(call_asgi(handler, "GET", "/slow"))
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, view_started.wait, 5)
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # キャンセル後にviewを終わらせ、viewが見ているHTTPRequestがリセットされていないことを確認する
+        finish_view.set()
+        while not seen_paths:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(cancel_while_running())
+    assert seen_paths == ["/slow"]
+
+
+def test_non_string_header_values_are_converted(monkeypatch):
+    def count(request):
+        return HTTPResponse(body=b"count", headers={"X-Count": 5})
+
+    monkeypatch.setattr(resolver, "url_patterns", {URLPattern("/count", count)})
+
+    assert Client().get("/count").headers["X-Count"] == "5"
+
+    start, _ = asyncio.run(call_asgi(ASGIHandler(), "GET", "/count"))
+    assert (b"x-count", b"5") in start["headers"]
+
+    response = HTTPResponse(body=b"count", content_type="text/plain", headers={"X-Count": 5})
+    assert "X-Count: 5\r\n" in Worker(None, ("127.0.0.1", 0)).build_response_header(response)
+
+
+def test_invalid_status_code_is_500_on_wsgi_and_asgi(monkeypatch):
+    def invalid(request):
+        return HTTPResponse(status_code=999)
+
+    monkeypatch.setattr(resolver, "url_patterns", {URLPattern("/invalid", invalid)})
+
+    assert Client().get("/invalid").status_code == 500
+
+    start, _ = asyncio.run(call_asgi(ASGIHandler(), "GET", "/invalid"))
+    assert start["status"] == 500
+
+
+def test_asgi_disconnect_does_not_call_view_or_send(monkeypatch):
+    calls = []
+
+    def login(request):
+        calls.append(request.path)
+        return HTTPResponse()
+
+    monkeypatch.setattr(resolver, "url_patterns", {URLPattern("/login", login)})
+    messages = [
+        {"type": "http.request", "body": b"userna", "more_body": True},
+        {"type": "http.disconnect"},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/login", "query_string": b"", "headers": []}
+    asyncio.run(ASGIHandler()(scope, receive, send))
+
+    assert calls == []
+    assert sent == []
+
+
+def test_wsgi_error_response_passes_exc_info():
+    environ = Client().build_environ("GET", "/now", b"", {})
+    calls = []
+
+    def start_response(status, headers, exc_info=None):
+        calls.append((status, exc_info))
+        if len(calls) == 1:
+            raise RuntimeError("start_response failed")
+
+    body = b"".join(WSGIHandler()(environ, start_response))
+
+    assert calls[1][0] == "500 Internal Server Error"
+    assert calls[1][1][0] is RuntimeError
+    assert b"500 Internal Server Error" in body
@@ -0,0 +1,86 @@
+from pyweb.http.request import HTTPRequest, HTTPRequestPool
+
+RAW_HEADERS = b"Host: localhost\r\nUser-Agent: naox-test\r\nCookie: username=naox; email=naox@example.com"
+
+
+def test_headers_are_parsed_lazily_from_memoryview():
+    buffer = memoryview(b"GET / HTTP/1.1\r\n" + RAW_HEADERS + b"\r\n\r\n")
+    request = HTTPRequest()
+    request.set_raw_headers(buffer[16:16 + len(RAW_HEADERS)])
+
+    # アクセスされるまではパースせず、受信バッファのviewを保持している
+    assert request._headers is None
+    assert isinstance(request._raw_headers, memoryview)
+
+    assert request.headers == {
+        "Host": "localhost",
+        "User-Agent": "naox-test",
+        "Cookie": "username=naox; email=naox@example.com",
+    }
+    assert request.cookies == {"username": "naox", "email": "naox@example.com"}
+    # パースした後は受信バッファへの参照を手放している
+    assert request._raw_headers == b""
+
+
+def test_headers_setter_reparses_cookies():
+    request = HTTPRequest()
+    request.headers = {"Cookie": "a=1"}
+    assert request.cookies == {"a": "1"}
+
+    request.headers = {"Cookie": "a=2"}
+    assert request.cookies == {"a": "2"}
+
+
+def test_reset_clears_previous_request():
+    request = HTTPRequest(path="/user/1/profile", method="POST", http_version="HTTP/1.1", body=b"a=1")
+    request.set_raw_headers(RAW_HEADERS)
+    request.params.update({"user_id": "1"})
+    request.cookies
+
+    params = request.params
+    request.reset()
+
+    assert request.path == ""
+    assert request.method == ""
+    assert request.http_version == ""
+    assert request.body == b""
+    assert request.params == {}
+    # params辞書は作り直さずに使い回す
+    assert request.params is params
+    assert request.headers == {}
+    assert request.cookies == {}
+
+
+def test_pool_reuses_released_request():
+    pool = HTTPRequestPool()
+    request = pool.acquire()
+    request.path = "/now"
+    request.headers = {"Cookie": "username=naox"}
+    request.cookies
+
+    pool.release(request)
+    assert len(pool) == 1
+
+    reused = pool.acquire()
+    assert reused is request
+    assert reused.path == ""
+    assert reused.headers == {}
+    assert reused.cookies == {}
+    assert len(pool) == 0
+
+
+def test_pool_discards_requests_over_max_size():
+    pool = HTTPRequestPool(max_size=2)
+    requests = [pool.acquire() for _ in range(3)]
+
+    for request in requests:
+        pool.release(request)
+
+    assert len(pool) == 2
+
+
+def test_pool_release_none_is_ignored():
+    pool = HTTPRequestPool()
+    pool.release(None)
+
+    assert len(pool) == 0
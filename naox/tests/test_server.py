@@ -0,0 +1,161 @@
+import shutil
+import socket
+import ssl
+import subprocess
+import threading
+
+import pytest
+
+import settings
+from pyweb.server.server import Server
+
+
+@pytest.fixture
+def self_signed_cert(tmp_path):
+    """
+    テスト用の自己署名証明書と秘密鍵を生成する
+    """
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl コマンドがないため証明書を生成できません")
+
+    certfile = tmp_path / "cert.pem"
+    keyfile = tmp_path / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", str(keyfile), "-out", str(certfile),
+            "-days", "1", "-subj", "/CN=localhost",
+            "-addext", "subjectAltName=DNS:localhost",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return str(certfile), str(keyfile)
+
+
+@pytest.fixture
+def run_server(tmp_path, monkeypatch):
+    """
+    Server.serve()を別スレッドで起動し、割り当てられたポート番号を返す関数を返す
+    """
+    # Workerは受信したリクエストをカレントディレクトリに書き出す
+    monkeypatch.chdir(tmp_path)
+    servers = []
+
+    def start() -> int:
+        server = Server(port=0)
+        threading.Thread(target=server.serve, daemon=True).start()
+        assert server.ready.wait(timeout=5)
+        servers.append(server)
+        return server.server_socket.getsockname()[1]
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.fixture
+def tls_server(self_signed_cert, run_server, monkeypatch):
+    """
+    TLSを有効にしたServerを起動し、ポート番号を返す
+    """
+    certfile, keyfile = self_signed_cert
+    monkeypatch.setattr(settings, "SSL_CERTFILE", certfile)
+    monkeypatch.setattr(settings, "SSL_KEYFILE", keyfile)
+    monkeypatch.setattr(settings, "SSL_HANDSHAKE_TIMEOUT", 2)
+    monkeypatch.setattr(settings, "RECV_TIMEOUT", 2)
+
+    return run_server()
+
+
+def create_client_context(certfile: str) -> ssl.SSLContext:
+    client_context = ssl.create_default_context(cafile=certfile)
+    client_context.set_alpn_protocols(["h2", "http/1.1"])
+    return client_context
+
+
+def request(client_context: ssl.SSLContext, port: int, session: ssl.SSLSession = None) -> dict:
+    """
+    /nowへGETリクエストを送信してレスポンスを最後まで受信し、ハンドシェイクの結果を返す
+    """
+    client_socket = client_context.wrap_socket(
+        socket.create_connection(("localhost", port), timeout=5), server_hostname="localhost", session=session
+    )
+    # コネクションが閉じられると取得できなくなるため、ハンドシェイク直後に記録しておく
+    handshake = {
+        "version": client_socket.version(),
+        "alpn": client_socket.selected_alpn_protocol(),
+        "session_reused": client_socket.session_reused,
+    }
+    client_socket.sendall(b"GET /now HTTP/1.1\r\nHost: localhost\r\n\r\n")
+
+    response = b""
+    while chunk := client_socket.recv(4096):
+        response += chunk
+    assert response.startswith(b"HTTP/1.1 200 OK")
+
+    # TLS1.3のセッションチケットはハンドシェイク後に送られるため、レスポンスを受信した後で取得する
+    handshake["session"] = client_socket.session
+    client_socket.close()
+
+    return handshake
+
+
+def test_create_ssl_context_returns_none_without_cert(monkeypatch):
+    monkeypatch.setattr(settings, "SSL_CERTFILE", None)
+    monkeypatch.setattr(settings, "SSL_KEYFILE", None)
+
+    assert Server().create_ssl_context() is None
+
+
+def test_tls_handshake_alpn_and_session_reuse(self_signed_cert, tls_server):
+    certfile, _ = self_signed_cert
+    client_context = create_client_context(certfile)
+
+    first = request(client_context, tls_server)
+    assert first["version"] in ("TLSv1.2", "TLSv1.3")
+    assert first["alpn"] == "http/1.1"
+    assert not first["session_reused"]
+
+    second = request(client_context, tls_server, session=first["session"])
+    assert second["session_reused"]
+
+
+def test_slow_handshake_does_not_block_accept(self_signed_cert, tls_server):
+    certfile, _ = self_signed_cert
+
+    # TCP接続だけしてハンドシェイクを始めないクライアント
+    idle_socket = socket.create_connection(("localhost", tls_server))
+    try:
+        handshake = request(create_client_context(certfile), tls_server)
+        assert handshake["alpn"] == "http/1.1"
+    finally:
+        idle_socket.close()
+
+
+def test_idle_client_after_handshake_times_out(self_signed_cert, tls_server):
+    certfile, _ = self_signed_cert
+
+    # ハンドシェイク後に何も送らないクライアントは、タイムアウトでサーバーから切断される
+    client_socket = create_client_context(certfile).wrap_socket(
+        socket.create_connection(("localhost", tls_server), timeout=5), server_hostname="localhost"
+    )
+    try:
+        assert client_socket.recv(4096) == b""
+    finally:
+        client_socket.close()
+
+
+def test_idle_plaintext_client_times_out(run_server, monkeypatch):
+    monkeypatch.setattr(settings, "SSL_CERTFILE", None)
+    monkeypatch.setattr(settings, "SSL_KEYFILE", None)
+    monkeypatch.setattr(settings, "RECV_TIMEOUT", 2)
+    port = run_server()
+
+    # 接続後に何も送らないクライアントは、タイムアウトでサーバーから切断される
+    client_socket = socket.create_connection(("localhost", port), timeout=5)
+    try:
+        assert client_socket.recv(4096) == b""
+    finally:
+        client_socket.close()
@@ -0,0 +1,5 @@
+from pyweb.handlers.wsgi import WSGIHandler
+
+# WSGIサーバーから呼び出すアプリケーション
+# naoxディレクトリで実行する ex) gunicorn wsgi:application
+application = WSGIHandler()